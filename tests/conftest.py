@@ -0,0 +1,211 @@
+"""
+Shared pytest-playwright configuration for the homepage tests.
+"""
+
+import os
+import re
+import socket
+import time
+import urllib.parse
+import urllib.request
+
+import pytest
+
+
+# `next start` serves on 3000; point PW_BASE_URL elsewhere for other servers
+# (`npm run dev` listens on 3100)
+BASE_URL = os.environ.get("PW_BASE_URL", "http://localhost:3000").rstrip("/")
+SCREENSHOT_DIR = "tests/screenshots"
+
+# Persistent browser profile, kept between runs so HTTP cache and compiled
+# chunks survive. Cache this directory across CI jobs to skip the cold start.
+# Only the cache is meant to carry over; see RESET_STORAGE_SCRIPT.
+PROFILE_DIR = os.environ.get("PW_PROFILE_DIR", "/tmp/pw-profile")
+
+# Runs before any app script on every document, so the persisted theme,
+# pinnedCoins and admin flag from a previous run never reach the app
+RESET_STORAGE_SCRIPT = "try { localStorage.clear(); sessionStorage.clear(); } catch {}"
+
+# The page is ready once the header has rendered its title; cheaper and more
+# reliable than networkidle, which the dev server's HMR socket keeps busy
+READY_SELECTOR = 'header:has(h1:has-text("Crypto"))'
+
+# The header is server-rendered, so it can match before React hydrates.
+# ThemeProvider sets data-theme only in its mount effect (the layout does not
+# render it), so its presence means the client handlers are attached.
+HYDRATED_SELECTOR = 'html[data-theme]'
+
+# Requested before the workers start so both the page and the prices API
+# route are compiled and warm
+WARMUP_PATHS = ("/", "/api/prices")
+
+# Requests no test asserts on, blocked to cut page weight: coin logos,
+# the avatar, self-hosted fonts and any other static images
+BLOCKED_URL_PATTERNS = [
+    "*.coingecko.com/*",
+    "*unavatar.io/*",
+    "*.woff*",
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.webp*",
+    "*.svg*",
+]
+
+# Chromium flags that trim start-up cost and memory per worker
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+]
+
+# How long (seconds) to wait for the server's port to open before giving up;
+# long enough to cover `npm run build` when the server is started by hand
+PORT_WAIT_SECONDS = int(os.environ.get("PW_PORT_WAIT", 60))
+
+# Tests run against a production build (next build && next start), so routes
+# are precompiled. Against `npm run dev` the first request compiles the page;
+# set PW_BASE_URL=http://localhost:3100 and raise PW_WARMUP_TIMEOUT (seconds)
+# to 120 for that.
+WARMUP_TIMEOUT_SECONDS = int(os.environ.get("PW_WARMUP_TIMEOUT", 30))
+NAV_TIMEOUT = 30000
+
+
+def _wait_for_port(host, port, timeout=PORT_WAIT_SECONDS):
+    """Return True once a TCP connection to host:port succeeds, False on timeout."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def _block_heavy_resources(context, page):
+    """
+    Block BLOCKED_URL_PATTERNS over CDP.
+
+    context.route() would also work, but any Playwright route disables the
+    HTTP cache, which is what the persistent profile is there to keep.
+    """
+    cdp = context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+
+def pytest_sessionstart(session):
+    """
+    Request the homepage once, before pytest-xdist spawns its workers.
+
+    Without this every worker's first goto races to trigger the same
+    server-side warmup (a full compile under `npm run dev`). Workers (which
+    carry `workerinput`) skip it. If the server is not listening at all, the
+    run exits immediately instead of every test waiting out its navigation
+    timeout.
+    """
+    if hasattr(session.config, "workerinput"):
+        return
+    url = urllib.parse.urlsplit(BASE_URL)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    if not _wait_for_port(url.hostname, port):
+        pytest.exit(f"Server not reachable at {BASE_URL}", returncode=1)
+    for path in WARMUP_PATHS:
+        try:
+            urllib.request.urlopen(BASE_URL + path, timeout=WARMUP_TIMEOUT_SECONDS).close()
+        except OSError as e:
+            print(f"Warmup request to {path} failed: {e}")
+
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(browser_type_launch_args):
+    """Skip Chromium start-up work headless CI never uses."""
+    return {
+        **browser_type_launch_args,
+        "args": [
+            *browser_type_launch_args.get("args", []),
+            *CHROMIUM_ARGS,
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args):
+    """Point every context at the local Next.js server so tests can goto('/')."""
+    return {**browser_context_args, "base_url": BASE_URL}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def screenshot_dir():
+    """Create the screenshots directory once per worker."""
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    return SCREENSHOT_DIR
+
+
+@pytest.fixture
+def save_screenshot(warm_page, screenshot_dir):
+    """Full-page screenshots are slow to encode, so only take them on request."""
+    def save(name):
+        if os.environ.get("SAVE_SCREENSHOTS"):
+            warm_page.screenshot(path=f"{screenshot_dir}/{name}.png", full_page=True)
+    return save
+
+
+@pytest.fixture(scope="session")
+def warm_page(browser_type, browser_type_launch_args, browser_context_args, worker_id):
+    """
+    Load the homepage once per worker and hand the same page to every test.
+
+    Readiness is anchored on READY_SELECTOR plus HYDRATED_SELECTOR rather
+    than networkidle. Each worker gets its own persistent profile, since
+    Chromium locks a user data dir to a single process. Cookies and web
+    storage are reset so every run starts from the app's defaults.
+    """
+    context = browser_type.launch_persistent_context(
+        f"{PROFILE_DIR}-{worker_id}",
+        **{**browser_type_launch_args, **browser_context_args},
+    )
+    context.clear_cookies()
+    context.add_init_script(RESET_STORAGE_SCRIPT)
+    page = context.pages[0] if context.pages else context.new_page()
+    _block_heavy_resources(context, page)
+    page.set_default_timeout(NAV_TIMEOUT)
+    page.goto('/', timeout=NAV_TIMEOUT, wait_until='domcontentloaded')
+    page.wait_for_selector(READY_SELECTOR, timeout=NAV_TIMEOUT)
+    page.wait_for_selector(HYDRATED_SELECTOR, state='attached', timeout=NAV_TIMEOUT)
+    yield page
+    context.close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Screenshot the shared page when a test using it fails."""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when != "call" or not report.failed:
+        return
+    page = item.funcargs.get("warm_page")
+    if page is None:
+        return
+    # A crashed page or a slow screenshot must not mask the real failure
+    try:
+        page.screenshot(path=f"{SCREENSHOT_DIR}/{item.name}_error.png", full_page=True)
+    except Exception as e:
+        report.sections.append(("failure screenshot", f"Could not save screenshot: {e}"))
+
+
+# Locators bound to the shared page, built once per worker and injected into
+# the tests that need them instead of re-created from selector strings.
+
+@pytest.fixture(scope="session")
+def theme_toggle(warm_page):
+    # Theme toggle aria-label is "Switch to light/dark mode"
+    return warm_page.get_by_role('button', name=re.compile('mode'))
@@ -2,219 +2,140 @@
 Playwright tests for Crypto What's Up homepage.
 Tests core UI elements and basic interactions.
 
-Run with: python scripts/with_server.py --server "npm run dev" --port 3000 -- python tests/test_homepage.py
+Requires: pip install pytest-playwright pytest-xdist
+
+Run with: python scripts/with_server.py --server "npm run build && npm run start" --port 3000 -- pytest -n auto -x tests/
+
+The production build serves precompiled routes. To run against `npm run dev`
+instead (port 3100, compiles on first request), set
+PW_BASE_URL=http://localhost:3100 and PW_WARMUP_TIMEOUT=120.
+
+pytest reports each result as it completes; -x stops the run at the first
+failure rather than finishing the remaining tests.
+
+Each xdist worker loads the homepage once (the `warm_page` fixture in
+conftest.py) and its tests reuse that DOM instead of re-navigating.
+Failure screenshots are saved to tests/screenshots/<test>_error.png; set
+SAVE_SCREENSHOTS=1 to also capture the passing states.
 """
 
-from playwright.sync_api import sync_playwright
-import sys
-import os
-
-
-def run_all_tests():
-    """Run all tests using a single browser session to avoid timeout issues."""
-
-    # Create screenshots directory
-    os.makedirs('tests/screenshots', exist_ok=True)
-
-    results = []
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.set_default_timeout(120000)  # 120s timeout for Next.js compile
-
-        # Warmup: First request triggers Next.js compilation
-        print("Warming up Next.js (first request triggers compilation)...")
-        try:
-            page.goto('http://localhost:3000', timeout=120000, wait_until='commit')
-            page.wait_for_load_state('networkidle', timeout=120000)
-            print("Warmup complete!")
-        except Exception as e:
-            print(f"Warmup navigation: {e}")
-
-        # ============================================
-        # Test 1: Homepage Elements
-        # ============================================
-        print("\n" + "="*50)
-        print("Running: Homepage Elements")
-        print("="*50)
-
-        try:
-            print("Navigating to homepage...")
-            page.goto('http://localhost:3000', timeout=120000)
-            page.wait_for_load_state('networkidle', timeout=60000)
-
-            # Test header
-            print("Testing header...")
-            header = page.locator('header')
-            assert header.is_visible(), "Header should be visible"
-
-            # Test app title
-            print("Testing app title...")
-            title = page.locator('h1:has-text("Crypto")')
-            assert title.is_visible(), "App title should be visible"
-
-            # Test theme toggle (aria-label contains "mode")
-            print("Testing theme toggle...")
-            theme_toggle = page.locator('button[aria-label*="mode"]')
-            assert theme_toggle.is_visible(), "Theme toggle should be visible"
-
-            # Test Current Prices section
-            print("Testing prices section...")
-            prices_heading = page.locator('h2:has-text("Current Prices")')
-            assert prices_heading.is_visible(), "Current Prices heading should be visible"
-
-            # Test What's Up button
-            print("Testing What's Up button...")
-            whatsup_button = page.locator('button:has-text("What\'s Up")')
-            assert whatsup_button.is_visible(), "What's Up button should be visible"
-
-            # Take screenshot
-            page.screenshot(path='tests/screenshots/homepage.png', full_page=True)
-            print("Homepage Elements: PASS")
-            results.append(("Homepage Elements", "PASS"))
-
-        except Exception as e:
-            print(f"Homepage Elements: FAIL - {e}")
-            page.screenshot(path='tests/screenshots/homepage_error.png', full_page=True)
-            results.append(("Homepage Elements", f"FAIL: {e}"))
-
-        # ============================================
-        # Test 2: Prices Load
-        # ============================================
-        print("\n" + "="*50)
-        print("Running: Prices Load")
-        print("="*50)
-
-        try:
-            # Wait for prices to load (they load on mount via useEffect)
-            print("Waiting for prices to load...")
-            page.wait_for_timeout(5000)  # Give time for API call
-
-            # Check if price cells are visible
-            price_cells = page.locator('.data-cell')
-            count = price_cells.count()
-            print(f"Found {count} price cells")
-
-            assert count > 0, "Should have at least one price cell"
-
-            # Verify first cell is visible
-            first_cell = price_cells.first
-            assert first_cell.is_visible(), "Price cell should be visible"
-
-            # Take screenshot
-            page.screenshot(path='tests/screenshots/prices_loaded.png', full_page=True)
-            print("Prices Load: PASS")
-            results.append(("Prices Load", "PASS"))
-
-        except Exception as e:
-            print(f"Prices Load: FAIL - {e}")
-            page.screenshot(path='tests/screenshots/prices_error.png', full_page=True)
-            results.append(("Prices Load", f"FAIL: {e}"))
-
-        # ============================================
-        # Test 3: Theme Toggle
-        # ============================================
-        print("\n" + "="*50)
-        print("Running: Theme Toggle")
-        print("="*50)
-
-        try:
-            # Find theme toggle button
-            theme_button = page.locator('button[aria-label*="mode"]')
-            assert theme_button.is_visible(), "Theme toggle should be visible"
-
-            # Get initial state from data-theme attribute (set by ThemeProvider)
-            html = page.locator('html')
-            initial_theme = html.get_attribute('data-theme') or 'dark'
-            print(f"Initial theme: '{initial_theme}'")
-
-            # Click toggle
-            print("Clicking theme toggle...")
-            theme_button.click()
-            page.wait_for_timeout(500)
-
-            # Check if data-theme changed
-            new_theme = html.get_attribute('data-theme') or ''
-            print(f"New theme: '{new_theme}'")
-
-            # Verify theme changed
-            assert initial_theme != new_theme, f"Theme should change from '{initial_theme}' to something else"
-
-            # Take screenshot
-            page.screenshot(path='tests/screenshots/theme_toggled.png', full_page=True)
-            print("Theme Toggle: PASS")
-            results.append(("Theme Toggle", "PASS"))
-
-        except Exception as e:
-            print(f"Theme Toggle: FAIL - {e}")
-            page.screenshot(path='tests/screenshots/theme_error.png', full_page=True)
-            results.append(("Theme Toggle", f"FAIL: {e}"))
-
-        # ============================================
-        # Test 4: Coin Selector
-        # ============================================
-        print("\n" + "="*50)
-        print("Running: Coin Selector")
-        print("="*50)
-
-        try:
-            # Find coin selector button
-            coin_selector = page.locator('button:has-text("coins"), button:has-text("Coins")')
-
-            if coin_selector.count() > 0 and coin_selector.first.is_visible():
-                print("Found coin selector, clicking...")
-                coin_selector.first.click()
-                page.wait_for_timeout(500)
-
-                # Check if dropdown opened
-                dropdown = page.locator('[role="listbox"], .dropdown, [class*="dropdown"]')
-                if dropdown.count() > 0:
-                    print("Coin selector dropdown opened")
-                    page.screenshot(path='tests/screenshots/coin_selector.png', full_page=True)
-
-                # Close by clicking elsewhere
-                page.locator('body').click(position={"x": 10, "y": 10})
-
-                print("Coin Selector: PASS")
-                results.append(("Coin Selector", "PASS"))
-            else:
-                print("Coin selector not found (may be hidden), skipping")
-                results.append(("Coin Selector", "SKIP"))
-
-        except Exception as e:
-            print(f"Coin Selector: FAIL - {e}")
-            results.append(("Coin Selector", f"FAIL: {e}"))
-
-        browser.close()
-
-    # Print summary
-    print("\n" + "="*50)
-    print("TEST SUMMARY")
-    print("="*50)
-
-    passed = 0
-    failed = 0
-    skipped = 0
-
-    for name, result in results:
-        if result == "PASS":
-            status = "PASS"
-            passed += 1
-        elif result == "SKIP":
-            status = "SKIP"
-            skipped += 1
-        else:
-            status = "FAIL"
-            failed += 1
-        print(f"  {status}: {name}")
-
-    print(f"\nTotal: {passed} passed, {failed} failed, {skipped} skipped")
-    print(f"Screenshots saved to tests/screenshots/")
-
-    return failed == 0
-
-
-if __name__ == "__main__":
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
+from playwright.sync_api import Locator, Page, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+import re
+import pytest
+
+
+# Homepage element visibility checks, evaluated in the browser in a single
+# call. Like Locator.is_visible(): rendered, not visibility:hidden, non-empty box.
+HOMEPAGE_CHECKS = """() => {
+    const isVisible = el => {
+        const box = el.getBoundingClientRect();
+        return box.width > 0 && box.height > 0 && el.checkVisibility({ visibilityProperty: true });
+    };
+    const visible = (selector, text) => Array.from(document.querySelectorAll(selector))
+        .some(el => (!text || el.textContent.includes(text)) && isVisible(el));
+    return {
+        header: visible('header'),
+        title: visible('h1', 'Crypto'),
+        themeToggle: visible('button[aria-label*="mode"]'),
+        prices: visible('h2', 'Current Prices'),
+        whatsup: visible('button', "What's Up"),
+    };
+}"""
+
+
+# Readable names for the HOMEPAGE_CHECKS keys, used in failure messages
+HOMEPAGE_ELEMENTS = {
+    'header': "Header",
+    'title': "App title",
+    'themeToggle': "Theme toggle",
+    'prices': "Current Prices heading",
+    'whatsup': "What's Up button",
+}
+
+
+# Runs against the theme toggle button: clicks it and polls every 20ms (up to
+# 5s) for data-theme to change. data-theme is set by ThemeProvider once it has
+# mounted, so a missing attribute means the page never hydrated.
+THEME_TOGGLE_SCRIPT = """async (button) => {
+    const html = document.documentElement;
+    const initial = html.dataset.theme;
+    if (!initial) {
+        return { ok: false, initial: null, now: null };
+    }
+    button.click();
+    const deadline = Date.now() + 5000;
+    while (Date.now() < deadline) {
+        if (html.dataset.theme !== initial) {
+            return { ok: true, initial, now: html.dataset.theme ?? null };
+        }
+        await new Promise(resolve => setTimeout(resolve, 20));
+    }
+    return { ok: false, initial, now: html.dataset.theme ?? null };
+}"""
+
+
+def wait_visible(locator: Locator, timeout: int = 2000) -> bool:
+    """Wait briefly for an optional element; False if it never shows."""
+    try:
+        locator.wait_for(state='visible', timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def test_homepage_elements(warm_page: Page, save_screenshot):
+    page = warm_page
+
+    # One round-trip for all five checks instead of one is_visible() call each
+    results = page.evaluate(HOMEPAGE_CHECKS)
+
+    # All five results arrive together, so report every missing element at once
+    missing = [HOMEPAGE_ELEMENTS[key] for key, visible in results.items() if not visible]
+    assert not missing, f"Should be visible: {', '.join(missing)}"
+
+    save_screenshot('homepage')
+
+
+def test_prices_load(warm_page: Page, save_screenshot):
+    page = warm_page
+
+    # Prices load on mount via useEffect; wait for the first cell to render.
+    # Scoped to the prices card, since the feature cards above it share the
+    # .data-cell class and are visible before any prices arrive.
+    prices_section = page.locator('section', has=page.get_by_role('heading', name='Current Prices'))
+    price_cells = prices_section.locator('.card .data-cell')
+    expect(price_cells.first).to_be_visible(timeout=15000)
+
+    save_screenshot('prices_loaded')
+
+
+def test_theme_toggle(theme_toggle: Locator, save_screenshot):
+    expect(theme_toggle).to_be_visible(timeout=10000)
+
+    # Read, click and poll in one round-trip on the same locator checked above
+    result = theme_toggle.evaluate(THEME_TOGGLE_SCRIPT)
+
+    assert result['initial'], "data-theme should be set once ThemeProvider has mounted"
+    assert result['ok'], f"Theme should change from '{result['initial']}', still '{result['now']}'"
+
+    save_screenshot('theme_toggled')
+
+
+def test_coin_selector(warm_page: Page, save_screenshot):
+    page = warm_page
+
+    # Matches the CoinSelector's "Select coins, N of M selected" aria-label
+    coin_selector = page.get_by_role('button', name=re.compile('coins', re.IGNORECASE))
+
+    if not wait_visible(coin_selector.first):
+        pytest.skip("Coin selector not found (may be hidden)")
+
+    coin_selector.first.click()
+
+    # The button reports its own open state
+    expect(coin_selector.first).to_have_attribute('aria-expanded', 'true')
+    save_screenshot('coin_selector')
+
+    # Close by clicking elsewhere
+    page.locator('body').click(position={"x": 10, "y": 10})